@@ -1,6 +1,38 @@
+import logging
+import os
+import sys
+
 from django.apps import AppConfig
 
+logger = logging.getLogger(__name__)
+
+
+def _is_management_command():
+    """True when running a manage.py command other than the development server."""
+    return os.path.basename(sys.argv[0]) == 'manage.py' and 'runserver' not in sys.argv
+
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """
+        Load and index the fuel station data at startup so the first API
+        request does not pay the CSV parsing and index build cost.
+
+        Skipped for management commands, and when the CSV still needs
+        geocoding: that can take hours and is left to the first request.
+        """
+        if _is_management_command():
+            return
+
+        from .utils import _get_stations, fuel_prices_geocoded
+
+        try:
+            if not fuel_prices_geocoded():
+                logger.warning("Fuel prices CSV is not geocoded; skipping station preload")
+                return
+            _get_stations()
+        except Exception:
+            logger.exception("Failed to preload fuel station data")
@@ -1,22 +1,41 @@
+import asyncio
 import csv
-import time
-import requests
 import os
 
+import httpx
+from aiolimiter import AsyncLimiter
+
+from .utils import (
+    GEOCODE_URL,
+    HTTP_LIMITS,
+    REQUEST_TIMEOUT,
+    USER_AGENT,
+    _cache_get,
+    _cache_key,
+    _cache_set,
+    _fetch_json,
+)
+
 # Input and output CSV file paths
 INPUT_CSV = '/Users/twofa/Desktop/fuel_optimizer/core/fuel-prices-for-be-assessment.csv'
 OUTPUT_CSV = 'fuel-price-geocoded.csv'
+# Sidecar checkpoint: rows processed, input offset and output offset after the last flush
+STATE_FILE = OUTPUT_CSV + '.state'
+CHECKPOINT_ROWS = 1000
+WRITE_BUFFER_SIZE = 1 << 20
 
-# Nominatim API endpoint and headers for user agent identification
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-HEADERS = {'User-Agent': 'FuelOptimizer/1.0'}
+# Concurrency settings: rows are geocoded in batches over a shared HTTP/2 connection
+# pool; HTTP settings and retries are shared with core.utils
+BATCH_SIZE = 64
 
 
-def geocode_address(city, state):
+async def geocode_address_async(client, limiter, city, state):
     """
     Geocode a city and state into latitude and longitude using Nominatim API.
 
     Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        limiter (AsyncLimiter): Rate limiter enforcing the Nominatim usage policy.
         city (str): City name.
         state (str): State name.
 
@@ -24,30 +43,54 @@ def geocode_address(city, state):
         tuple: (latitude, longitude) as floats if successful, otherwise (None, None).
     """
     try:
-        query = f"{city}, {state}, USA"
+        # Structured query: Nominatim matches the fields directly instead of parsing free text
         params = {
-            'q': query,
+            'city': city,
+            'state': state,
+            'country': 'USA',
             'format': 'json',
             'limit': 1
         }
-        response = requests.get(NOMINATIM_URL, params=params, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = await _fetch_json(client, GEOCODE_URL, params, limiter)
         if data:
             lat = float(data[0]['lat'])
             lon = float(data[0]['lon'])
             return lat, lon
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Network error while geocoding '{city}, {state}': {e}")
     except Exception as e:
         print(f"Failed to geocode '{city}, {state}': {e}")
     return None, None
 
 
+async def geocode_cached(client, limiter, city, state):
+    """
+    Geocode a city and state through the persistent geocode cache shared with core.utils.
+
+    Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        limiter (AsyncLimiter): Nominatim rate limiter.
+        city (str): City name.
+        state (str): State name.
+
+    Returns:
+        tuple: (latitude, longitude) as floats if successful, otherwise (None, None).
+    """
+    cached = _cache_get((city, state))
+    if cached is not None:
+        return cached
+    lat, lon = await geocode_address_async(client, limiter, city, state)
+    _cache_set((city, state), lat, lon)
+    return lat, lon
+
+
 def get_processed_rows_count(output_csv):
     """
     Determine how many rows have already been processed in the output CSV.
 
+    Only used for output files written before checkpointing existed, since it
+    scans the whole file; otherwise the count comes from the state file.
+
     Args:
         output_csv (str): Path to the output CSV file.
 
@@ -62,45 +105,242 @@ def get_processed_rows_count(output_csv):
         return max(count, 0)
 
 
-def geocode_csv():
+def read_state(state_file):
     """
-    Read the input CSV, geocode city/state pairs, and append lat/lon to the output CSV.
+    Read the last checkpoint from the state file.
+
+    Args:
+        state_file (str): Path to the state sidecar file.
+
+    Returns:
+        tuple or None: (processed_rows, input_offset, output_offset), or None
+                       if no valid checkpoint exists.
+    """
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            processed_rows, input_offset, output_offset = map(int, f.read().split(','))
+            return processed_rows, input_offset, output_offset
+    except (OSError, ValueError):
+        return None
+
 
-    Resumes from where it left off if the output CSV exists.
+def checkpoint_matches(state, input_csv, output_csv):
     """
-    processed_rows = get_processed_rows_count(OUTPUT_CSV)
-    print(f"Rows already processed: {processed_rows}")
+    Check that a checkpoint's offsets lie within the files it refers to.
 
-    with open(INPUT_CSV, newline='', encoding='utf-8') as infile, \
-         open(OUTPUT_CSV, 'a', newline='', encoding='utf-8') as outfile:
+    A checkpoint left behind after the output CSV was deleted or replaced
+    would otherwise grow the output with NUL bytes on truncate.
 
-        reader = csv.DictReader(infile)
-        # Append Latitude and Longitude fields to existing CSV headers
-        fieldnames = reader.fieldnames + ['Latitude', 'Longitude']
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+    Args:
+        state (tuple): (processed_rows, input_offset, output_offset) from read_state().
+        input_csv (str): Path to the input CSV file.
+        output_csv (str): Path to the output CSV file.
 
-        # Write header if output CSV is empty
-        if processed_rows == 0:
-            writer.writeheader()
+    Returns:
+        bool: True if the checkpoint can be resumed from.
+    """
+    _, input_offset, output_offset = state
+    if not os.path.exists(output_csv):
+        return False
+    return input_offset <= os.path.getsize(input_csv) and output_offset <= os.path.getsize(output_csv)
 
-        for i, row in enumerate(reader):
-            # Skip rows already processed
-            if i < processed_rows:
-                continue
 
-            city = row.get('City')
-            state = row.get('State')
+def save_checkpoint(outfile, processed_rows, input_offset):
+    """
+    Flush the output CSV and record how far both files have been processed.
+
+    The state file is replaced atomically, so a crash mid-write never leaves
+    a torn checkpoint behind.
+
+    Args:
+        outfile (file): Output CSV file object.
+        processed_rows (int): Number of input rows written so far.
+        input_offset (int): Input file position just past the last written row.
+    """
+    outfile.flush()
+    tmp_path = STATE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f"{processed_rows},{input_offset},{outfile.tell()}")
+    os.replace(tmp_path, STATE_FILE)
 
-            lat, lon = geocode_address(city, state)
-            row['Latitude'] = lat
-            row['Longitude'] = lon
 
-            writer.writerow(row)
+async def write_results(queue, writer, outfile, next_index, input_offset):
+    """
+    Single writer coroutine: drain geocoded rows from the queue and write them.
+
+    Rows arrive in completion order but are written in input order, so the
+    output CSV always holds a contiguous prefix of the input and can be resumed.
+    A checkpoint is saved every CHECKPOINT_ROWS rows and when writing stops.
+
+    Args:
+        queue (asyncio.Queue): Queue of (row_index, row, offset) items, terminated by None.
+        writer (csv.writer): Writer for the output CSV.
+        outfile (file): Output CSV file object.
+        next_index (int): Index of the first row to be written.
+        input_offset (int): Input file position before the first row to be written.
+    """
+    pending = {}
+    unsaved_rows = 0
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            i, row, offset = item
+            pending[i] = (row, offset)
+
+            while next_index in pending:
+                row, input_offset = pending.pop(next_index)
+                writer.writerow(row)
+                next_index += 1
+                unsaved_rows += 1
+                if unsaved_rows >= CHECKPOINT_ROWS:
+                    save_checkpoint(outfile, next_index, input_offset)
+                    unsaved_rows = 0
+    finally:
+        save_checkpoint(outfile, next_index, input_offset)
+
+
+async def geocode_row(client, limiter, queue, lookups, i, row, offset, city_idx, state_idx):
+    """
+    Geocode a single input row and hand it to the writer.
+
+    Rows sharing a (city, state) pair await the same lookup, so each distinct
+    pair is requested at most once per run.
+
+    Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        limiter (AsyncLimiter): Nominatim rate limiter.
+        queue (asyncio.Queue): Queue consumed by write_results().
+        lookups (dict): Cache key -> in-flight or finished lookup task.
+        i (int): Index of the row in the input CSV.
+        row (list): Input row values.
+        offset (int): Input file position just past this row.
+        city_idx (int): Column index of the city field.
+        state_idx (int): Column index of the state field.
+    """
+    city, state = row[city_idx], row[state_idx]
+    if city and state:
+        key = _cache_key((city, state))
+        if key not in lookups:
+            lookups[key] = asyncio.ensure_future(geocode_cached(client, limiter, city, state))
+        lat, lon = await lookups[key]
+        print(f"[{i}] Geocoded: {city}, {state} => {lat}, {lon}")
+    else:
+        print(f"[{i}] Missing city/state. Skipping.")
+        lat, lon = None, None
+    await queue.put((i, row + [lat, lon], offset))
+
+
+async def geocode_rows(rows, writer, outfile, start_index, input_offset, city_idx, state_idx):
+    """
+    Geocode rows concurrently in bounded batches and write them via a single writer.
+
+    Args:
+        rows (iterable): Iterable of (row_index, row, offset) tuples still to be processed.
+        writer (csv.writer): Writer for the output CSV.
+        outfile (file): Output CSV file object.
+        start_index (int): Index of the first row in `rows`.
+        input_offset (int): Input file position before the first row in `rows`.
+        city_idx (int): Column index of the city field.
+        state_idx (int): Column index of the state field.
+    """
+    queue = asyncio.Queue()
+    lookups = {}
+    # Respect Nominatim usage policy: max 1 request per second
+    limiter = AsyncLimiter(1, 1)
+
+    async with httpx.AsyncClient(
+        http2=True, timeout=REQUEST_TIMEOUT, limits=HTTP_LIMITS, headers={'User-Agent': USER_AGENT}
+    ) as client:
+        writer_task = asyncio.create_task(write_results(queue, writer, outfile, start_index, input_offset))
+
+        batch = []
+        for i, row, offset in rows:
+            batch.append(geocode_row(
+                client, limiter, queue, lookups, i, row, offset, city_idx, state_idx
+            ))
+            if len(batch) >= BATCH_SIZE:
+                await asyncio.gather(*batch)
+                batch = []
+        if batch:
+            await asyncio.gather(*batch)
+
+        await queue.put(None)
+        await writer_task
+
+
+def iter_rows(infile, reader, start_index, width):
+    """
+    Yield input rows together with the file position just past each row.
+
+    Like csv.DictReader, blank lines are skipped and do not count as rows,
+    and short rows are padded with empty fields.
+
+    Args:
+        infile (file): Input CSV file object, read line by line.
+        reader (csv.reader): Reader pulling lines from `infile`.
+        start_index (int): Index of the first row yielded.
+        width (int): Number of columns in the header.
+
+    Yields:
+        tuple: (row_index, row, offset).
+    """
+    i = start_index
+    for row in reader:
+        if not row:
+            continue
+        yield i, row + [''] * (width - len(row)), infile.tell()
+        i += 1
+
+
+def geocode_csv():
+    """
+    Read the input CSV, geocode city/state pairs, and append lat/lon to the output CSV.
+
+    Resumes from the last checkpoint in the state file: the output CSV is cut
+    back to the checkpointed size and the input is seeked straight to the
+    matching offset, so neither file is rescanned.
+    """
+    state = read_state(STATE_FILE)
+    if state is not None and not checkpoint_matches(state, INPUT_CSV, OUTPUT_CSV):
+        print("Ignoring checkpoint that does not match the input/output CSV files.")
+        state = None
+
+    with open(INPUT_CSV, newline='', encoding='utf-8') as infile, \
+         open(OUTPUT_CSV, 'a', buffering=WRITE_BUFFER_SIZE, newline='', encoding='utf-8') as outfile:
+
+        # Read via readline() rather than iteration so infile.tell() stays usable
+        reader = csv.reader(iter(infile.readline, ''))
+        header = next(reader)
+        city_idx = header.index('City')
+        state_idx = header.index('State')
+        writer = csv.writer(outfile)
+
+        if state is not None:
+            processed_rows, input_offset, output_offset = state
+            # Rows written after the last checkpoint are dropped and geocoded again
+            outfile.truncate(output_offset)
+            # truncate() leaves the stream position alone; move it to the new end
+            outfile.seek(0, os.SEEK_END)
+            infile.seek(input_offset)
+        else:
+            # No checkpoint: fall back to counting rows of an existing output CSV once
+            processed_rows = get_processed_rows_count(OUTPUT_CSV)
+            for _ in zip(range(processed_rows), iter_rows(infile, reader, 0, len(header))):
+                pass
+
+        # Write header if output CSV is empty
+        if outfile.tell() == 0:
+            # Append Latitude and Longitude fields to existing CSV headers
+            writer.writerow(header + ['Latitude', 'Longitude'])
 
-            print(f"[{i}] Geocoded: {city}, {state} => {lat}, {lon}")
+        print(f"Rows already processed: {processed_rows}")
 
-            # Respect Nominatim usage policy: max 1 request per second
-            time.sleep(1)
+        rows = iter_rows(infile, reader, processed_rows, len(header))
+        asyncio.run(geocode_rows(
+            rows, writer, outfile, processed_rows, infile.tell(), city_idx, state_idx
+        ))
 
 
 if __name__ == "__main__":
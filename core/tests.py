@@ -1,3 +1,328 @@
-from django.test import TestCase
+import contextlib
+import io
+import os
+import shelve
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import geocode_csv
+from .utils import (
+    _build_stations,
+    _cheapest_within,
+    _find_nearby,
+    _get_stations,
+    _load_stations,
+    _radius_haversine,
+    _range_stop_indices,
+    _station_entry,
+    load_fuel_prices,
+)
+from .views import response_cache_key
+
+
+class RangeStopIndicesTests(SimpleTestCase):
+    def test_stops_where_range_is_reached(self):
+        cumulative = np.array([100.0, 200.0, 300.0, 400.0, 500.0])
+        self.assertEqual(_range_stop_indices(cumulative, 150), [2, 4])
+
+    def test_no_stops_within_range(self):
+        cumulative = np.array([100.0, 200.0])
+        self.assertEqual(_range_stop_indices(cumulative, 500), [])
+
+    def test_rejects_non_positive_range(self):
+        cumulative = np.array([100.0, 200.0])
+        for range_miles in (0, -10, float('nan')):
+            with self.assertRaises(ValueError):
+                _range_stop_indices(cumulative, range_miles)
+
+
+class StationsTests(SimpleTestCase):
+    def test_reports_exact_station_values(self):
+        stations = _build_stations([pd.DataFrame({
+            'latitude': [29.741235, 30.5],
+            'longitude': [-95.221358, -96.0],
+            'price': [3.00733333, 2.899],
+            'truckstop_name': ['B', 'A'],
+        })])
+        # Cheapest first
+        self.assertEqual(_station_entry(stations, 0), ((30.5, -96.0), 2.899, 'A'))
+        self.assertEqual(_station_entry(stations, 1), ((29.741235, -95.221358), 3.00733333, 'B'))
+
+    def test_kernel_picks_cheapest_nearby_station(self):
+        rng = np.random.default_rng(0)
+        stations = _build_stations([pd.DataFrame({
+            'latitude': rng.uniform(30, 40, 500),
+            'longitude': rng.uniform(-100, -90, 500),
+            'price': rng.uniform(2.5, 4.5, 500),
+        })])
+        points = np.column_stack([rng.uniform(30, 40, 50), rng.uniform(-100, -90, 50)])
+        point_rad = np.radians(points).astype(np.float32)
+        best = _cheapest_within(
+            np.ascontiguousarray(point_rad[:, 0]),
+            np.ascontiguousarray(point_rad[:, 1]),
+            stations.lat_rad,
+            stations.lon_rad,
+            stations.cos_lat,
+            _radius_haversine(25),
+        )
+        for point, station_idx in zip(points, best):
+            nearby = _find_nearby(tuple(point), stations, 25)
+            expected = nearby[0] if nearby else None
+            found = _station_entry(stations, station_idx) if station_idx >= 0 else None
+            self.assertEqual(found, expected)
+
+
+class FuelPricesCsvTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv_path = os.path.join(tmp.name, 'fuel-prices.csv')
+        patcher = mock.patch('core.utils._fuel_prices_path', return_value=self.csv_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_csv(self, text):
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_missing_coordinates_are_geocoded(self):
+        self.write_csv(
+            "Truckstop Name,City,State,Retail Price\n"
+            "Stop A,Austin,TX,3.1\n"
+            "\n"
+            "Stop B\n"
+            "Stop C,Dallas,TX,2.9\n"
+        )
+        _load_stations.cache_clear()
+        fake = {('Austin', 'TX'): (30.27, -97.74), ('Dallas', 'TX'): (32.78, -96.8)}
+        with mock.patch('core.utils.geocode_addresses', side_effect=lambda a: [fake[x] for x in a]), \
+                contextlib.redirect_stdout(io.StringIO()):
+            stations = _get_stations()
+
+        self.assertEqual(list(stations.names), ['Stop C', 'Stop A'])
+        self.assertEqual(_station_entry(stations, 0), ((32.78, -96.8), 2.9, 'Stop C'))
+        self.assertEqual(os.listdir(os.path.dirname(self.csv_path)), ['fuel-prices.csv'])
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), [
+                "Truckstop Name,City,State,Retail Price,Latitude,Longitude",
+                "Stop A,Austin,TX,3.1,30.27,-97.74",
+                "Stop B,,,,,",
+                "Stop C,Dallas,TX,2.9,32.78,-96.8",
+            ])
+
+    def test_failed_geocode_leaves_csv_untouched(self):
+        original = "Truckstop Name,City,State,Retail Price\nStop A,Austin,TX,3.1\n"
+        self.write_csv(original)
+        with mock.patch('core.utils.geocode_addresses', side_effect=RuntimeError("boom")), \
+                contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(RuntimeError):
+                load_fuel_prices()
+
+        self.assertEqual(os.listdir(os.path.dirname(self.csv_path)), ['fuel-prices.csv'])
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            self.assertEqual(f.read(), original)
+
+    def test_header_case_and_spacing_are_ignored(self):
+        self.write_csv(
+            " truckstop name ,CITY,state,retail price,latitude,longitude,Extra\n"
+            "Stop A,Austin,TX,3.1,30.27,-97.74,x\n"
+        )
+        df = load_fuel_prices()
+        self.assertEqual(
+            list(df.columns),
+            ['truckstop_name', 'city', 'state', 'price', 'latitude', 'longitude'],
+        )
+        self.assertEqual(df.iloc[0]['latitude'], 30.27)
+
+
+class FuelOptimizerValidationTests(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('fuel-optimizer')
+        self.payload = {
+            "start": {"lat": 40.7128, "lon": -74.0060},
+            "end": {"lat": 41.8781, "lon": -87.6298},
+        }
+
+    @mock.patch('core.views.plan_fuel_stops')
+    def test_rejects_non_positive_vehicle_parameters(self, plan_fuel_stops):
+        for params in ({"mpg": 0}, {"mpg": -5}, {"range": 0}, {"range": -100}, {"radius": -1}):
+            response = self.client.post(self.url, {**self.payload, **params}, format='json')
+            self.assertEqual(response.status_code, 400, params)
+        plan_fuel_stops.assert_not_called()
+
+
+class ResponseCacheKeyTests(SimpleTestCase):
+    signature = (1_700_000_000_000_000_000, 12345)
+
+    def key(self, start=(40.7128, -74.006), end=(41.8781, -87.6298), mpg=10.0,
+            range_miles=500.0, radius=10.0, signature=signature):
+        return response_cache_key(start, end, mpg, range_miles, radius, signature)
+
+    def test_nearby_coordinates_share_a_key(self):
+        self.assertEqual(self.key(start=(40.712801, -74.006001)), self.key())
+
+    def test_different_parameters_get_different_keys(self):
+        base = self.key()
+        self.assertNotEqual(self.key(start=(40.72, -74.006)), base)
+        self.assertNotEqual(self.key(end=(41.88, -87.6298)), base)
+        self.assertNotEqual(self.key(mpg=12.0), base)
+        self.assertNotEqual(self.key(range_miles=400.0), base)
+        self.assertNotEqual(self.key(radius=5.0), base)
+
+    def test_station_data_version_is_part_of_the_key(self):
+        self.assertNotEqual(self.key(signature=(self.signature[0] + 1, self.signature[1])), self.key())
+
+
+@mock.patch('core.views.stations_signature', return_value=(1, 1))
+@mock.patch('core.views.plan_fuel_stops', return_value={"fuel_stops": []})
+class FuelOptimizerCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('fuel-optimizer')
+        self.payload = {
+            "start": {"lat": 40.7128, "lon": -74.0060},
+            "end": {"lat": 41.8781, "lon": -87.6298},
+        }
+
+    def test_repeated_request_is_served_from_cache(self, plan_fuel_stops, stations_signature):
+        first = self.client.post(self.url, self.payload, format='json')
+        second = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        plan_fuel_stops.assert_called_once()
+
+    def test_reloaded_station_data_misses_the_cache(self, plan_fuel_stops, stations_signature):
+        self.client.post(self.url, self.payload, format='json')
+        stations_signature.return_value = (2, 1)
+        self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(plan_fuel_stops.call_count, 2)
+
+
+async def fake_geocode(client, limiter, city, state):
+    return float(len(city)), float(len(state))
+
+
+@mock.patch('core.geocode_csv.geocode_address_async', fake_geocode)
+class GeocodeCsvResumeTests(SimpleTestCase):
+    rows = [f"{i},Station {i},City{'x' * i},TX\n" for i in range(5)]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_csv = os.path.join(tmp.name, 'input.csv')
+        self.output_csv = os.path.join(tmp.name, 'output.csv')
+        self.state_file = self.output_csv + '.state'
+        for name, value in [('INPUT_CSV', self.input_csv), ('OUTPUT_CSV', self.output_csv),
+                            ('STATE_FILE', self.state_file)]:
+            patcher = mock.patch.object(geocode_csv, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Keep the persistent geocode cache out of the source tree
+        geocode_cache = shelve.open(os.path.join(tmp.name, 'geocode_cache'))
+        self.addCleanup(geocode_cache.close)
+        patcher = mock.patch('core.utils._cache', geocode_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.header = "ID,Truckstop Name,City,State\n"
+        with open(self.input_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(self.header + ''.join(self.rows))
+
+    def run_geocode(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            geocode_csv.geocode_csv()
+        with open(self.output_csv, newline='', encoding='utf-8') as f:
+            return f.read()
+
+    def expected_output(self):
+        lines = ["ID,Truckstop Name,City,State,Latitude,Longitude\r\n"]
+        for i, row in enumerate(self.rows):
+            lines.append(f"{row.rstrip()},{float(4 + i)},2.0\r\n")
+        return ''.join(lines)
+
+    def test_fresh_run(self):
+        self.assertEqual(self.run_geocode(), self.expected_output())
+        self.assertEqual(geocode_csv.read_state(self.state_file)[0], len(self.rows))
+
+    def test_blank_and_short_rows(self):
+        with open(self.input_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(self.header + self.rows[0] + "\n" + "9,Station 9\n" + self.rows[1])
+        expected = (
+            "ID,Truckstop Name,City,State,Latitude,Longitude\r\n"
+            "0,Station 0,City,TX,4.0,2.0\r\n"
+            "9,Station 9,,,,\r\n"
+            "1,Station 1,Cityx,TX,5.0,2.0\r\n"
+        )
+        self.assertEqual(self.run_geocode(), expected)
+        self.assertEqual(geocode_csv.read_state(self.state_file),
+                         (3, os.path.getsize(self.input_csv), len(expected)))
+
+        # Resuming just before the blank line skips it again
+        checkpoint = ''.join(expected.splitlines(keepends=True)[:2])
+        with open(self.output_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(checkpoint)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            f.write(f"1,{len(self.header) + len(self.rows[0])},{len(checkpoint)}")
+        self.assertEqual(self.run_geocode(), expected)
+
+    def test_repeated_city_state_is_fetched_once(self):
+        self.rows = [f"{i},Station {i},City{i % 2},TX\n" for i in range(6)]
+        with open(self.input_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(self.header + ''.join(self.rows))
+        lookups = []
+
+        async def counting_geocode(client, limiter, city, state):
+            lookups.append((city, state))
+            return await fake_geocode(client, limiter, city, state)
+
+        with mock.patch('core.geocode_csv.geocode_address_async', counting_geocode):
+            output = self.run_geocode()
+            self.assertEqual(sorted(lookups), [('City0', 'TX'), ('City1', 'TX')])
+
+            # A later run is served from the persistent cache
+            os.remove(self.output_csv)
+            os.remove(self.state_file)
+            self.assertEqual(self.run_geocode(), output)
+            self.assertEqual(len(lookups), 2)
+
+    def test_resume_drops_rows_written_after_the_checkpoint(self):
+        expected = self.expected_output()
+        checkpoint = ''.join(expected.splitlines(keepends=True)[:3])
+        with open(self.output_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(checkpoint + "2,Station 2,Cit")
+        input_offset = len(self.header) + len(self.rows[0]) + len(self.rows[1])
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            f.write(f"2,{input_offset},{len(checkpoint)}")
+
+        self.assertEqual(self.run_geocode(), expected)
+        # The new checkpoint must point at the real end of the output
+        self.assertEqual(geocode_csv.read_state(self.state_file),
+                         (len(self.rows), os.path.getsize(self.input_csv), len(expected)))
+
+    def test_resume_with_nothing_left_records_truncated_size(self):
+        expected = self.expected_output()
+        with open(self.output_csv, 'w', newline='', encoding='utf-8') as f:
+            f.write(expected + "4,Station 4,Cit")
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            f.write(f"{len(self.rows)},{os.path.getsize(self.input_csv)},{len(expected)}")
+
+        self.assertEqual(self.run_geocode(), expected)
+        self.assertEqual(geocode_csv.read_state(self.state_file)[2], len(expected))
+
+    def test_stale_checkpoint_without_output_starts_over(self):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            f.write("1000,50000,100000")
+
+        output = self.run_geocode()
+        self.assertEqual(output, self.expected_output())
+        self.assertNotIn('\0', output)
@@ -1,19 +1,80 @@
 from django.conf import settings
+import numpy as np
 import pandas as pd
-import requests
-from geopy.distance import geodesic
-import time
+import httpx
+from aiolimiter import AsyncLimiter
+from numba import njit, prange
+import asyncio
+import atexit
+import csv
+import functools
+import itertools
 import os
+import shelve
+import tempfile
+import threading
+import time
+from collections import namedtuple
 
 # Constants
 GEOCODE_URL = "https://nominatim.openstreetmap.org/search"
 USER_AGENT = "fuel-route-app/1.0"
 MAX_RETRIES = 3
-RETRY_DELAY = 1  # seconds
+RETRY_BACKOFF = 1  # seconds, doubled on each retry
+RETRY_STATUSES = {429, 502, 503, 504}
 
 LOCATIONIQ_URL = "https://us1.locationiq.com/v1/search.php"
 LOCATIONIQ_API_KEY = os.getenv("LOCATIONIQ_API_KEY", "your_locationiq_api_key_here")
 
+# HTTP/2 connection pooling: keep-alive connections are reused and requests to
+# the same host are multiplexed over one TLS connection.
+REQUEST_TIMEOUT = 10  # seconds
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+
+# Shared client for synchronous geocode and route calls; connection failures
+# are retried by the transport, rate-limit/gateway responses by _get_with_retry().
+CLIENT = httpx.Client(
+    timeout=REQUEST_TIMEOUT,
+    headers={"User-Agent": USER_AGENT},
+    transport=httpx.HTTPTransport(http2=True, limits=HTTP_LIMITS, retries=MAX_RETRIES),
+)
+
+# Async batch geocoding: bounded concurrency plus per-provider rate limits
+GEOCODE_BATCH_SIZE = 256
+GEOCODE_STREAM_ROWS = 1000  # CSV rows held in memory at a time when filling in coordinates
+NOMINATIM_RATE = 1  # requests per second (Nominatim usage policy)
+LOCATIONIQ_RATE = 2  # requests per second
+
+EARTH_RADIUS_MILES = 3958.8
+FUEL_PRICES_CSV = "fuel-price-geocoded.csv"
+FUEL_PRICES_CHUNK_ROWS = 100_000  # rows parsed per chunk, bounding peak memory
+# Only the columns the optimizer uses are parsed, with explicit types; keyed
+# by normalized column name, so header case and spacing do not matter
+FUEL_PRICES_DTYPES = {
+    "truckstop_name": "string[pyarrow]",
+    "city": "string[pyarrow]",
+    "state": "string[pyarrow]",
+    "price": "float64[pyarrow]",
+    "latitude": "float64[pyarrow]",
+    "longitude": "float64[pyarrow]",
+}
+
+# Station data prepared once for repeated nearby-station queries, held as
+# parallel arrays (structure of arrays) rather than a DataFrame. Reported
+# values stay float64; only the radian arrays scanned by the kernel are float32.
+Stations = namedtuple(
+    "Stations",
+    ["latitudes", "longitudes", "lat_rad", "lon_rad", "cos_lat", "prices", "names"],
+)
+
+# Persistent geocode cache: normalized address -> (lat, lon, timestamp)
+GEOCODE_CACHE_NAME = "geocode_cache"
+_cache = None
+_cache_lock = threading.Lock()
+
+# Serializes station data loads, including the geocode-fill of the CSV
+_stations_lock = threading.Lock()
+
 
 def preprocess_address(addr):
     """
@@ -28,8 +89,119 @@ def preprocess_address(addr):
     """
     if not addr:
         return ""
-    addr = addr.replace('&', 'and').replace('EXIT', 'Exit').strip()
-    return addr
+    return addr.replace('&', 'and').replace('EXIT', 'Exit').strip()
+
+
+def _address_label(address):
+    """Render a free-form address or a (city, state) pair as a single string."""
+    if isinstance(address, tuple):
+        return ", ".join(address)
+    return address
+
+
+def _query_params(address):
+    """
+    Build the address part of a Nominatim/LocationIQ search query.
+
+    (city, state) pairs use a structured query, which the geocoders resolve
+    without free-text parsing; plain strings fall back to a `q=` search.
+
+    Args:
+        address (str or tuple): Address string or (city, state) pair.
+
+    Returns:
+        dict: Query parameters identifying the address.
+    """
+    if isinstance(address, tuple):
+        city, state = address
+        return {"city": city, "state": state, "country": "USA"}
+    return {"q": address}
+
+
+def _cache_key(address):
+    """Normalize an address into its geocode cache key."""
+    return preprocess_address(_address_label(address)).lower()
+
+
+def _get_cache():
+    """
+    Open the on-disk geocode cache on first use.
+
+    Returns:
+        shelve.Shelf: Mapping of normalized address to (lat, lon, timestamp).
+    """
+    global _cache
+    if _cache is None:
+        # Next to this module rather than under settings.BASE_DIR, so the
+        # standalone geocode_csv script can share the cache
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), GEOCODE_CACHE_NAME)
+        _cache = shelve.open(path)
+        atexit.register(_cache.close)
+    return _cache
+
+
+def _cache_get(address):
+    """Return cached (lat, lon) for an address, or None on a cache miss."""
+    with _cache_lock:
+        entry = _get_cache().get(_cache_key(address))
+    if entry is None:
+        return None
+    lat, lon, _ = entry
+    return lat, lon
+
+
+def _cache_set(address, lat, lon):
+    """Store a successful geocode result; failures are not cached so they get retried."""
+    if lat is None or lon is None:
+        return
+    with _cache_lock:
+        cache = _get_cache()
+        cache[_cache_key(address)] = (lat, lon, time.time())
+        cache.sync()
+
+
+def clear_cache(max_age=None):
+    """
+    Evict entries from the persistent geocode cache.
+
+    Args:
+        max_age (float): Evict only entries older than this many seconds.
+                         If None, the whole cache is cleared.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    with _cache_lock:
+        cache = _get_cache()
+        if max_age is None:
+            stale = list(cache.keys())
+        else:
+            cutoff = time.time() - max_age
+            stale = [key for key, (_, _, ts) in cache.items() if ts < cutoff]
+        for key in stale:
+            del cache[key]
+        cache.sync()
+    return len(stale)
+
+
+def _get_with_retry(url, params=None, headers=None):
+    """
+    GET via the shared client, retrying rate-limit and gateway errors.
+
+    Args:
+        url (str): Endpoint URL.
+        params (dict): Query parameters.
+        headers (dict): Extra request headers.
+
+    Returns:
+        httpx.Response: The final response, after up to MAX_RETRIES retries
+                        with exponential back-off.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = CLIENT.get(url, params=params, headers=headers)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
 
 
 def geocode_locationiq(address):
@@ -37,7 +209,7 @@ def geocode_locationiq(address):
     Geocode an address using LocationIQ as a fallback geocoder.
 
     Args:
-        address (str): Address string to geocode.
+        address (str or tuple): Address string, or (city, state) pair for a structured query.
 
     Returns:
         tuple or (None, None): Latitude and longitude if found,
@@ -45,12 +217,12 @@ def geocode_locationiq(address):
     """
     params = {
         "key": LOCATIONIQ_API_KEY,
-        "q": address,
+        **_query_params(address),
         "format": "json",
         "limit": 1
     }
     try:
-        response = requests.get(LOCATIONIQ_URL, params=params, timeout=10)
+        response = _get_with_retry(LOCATIONIQ_URL, params=params)
         response.raise_for_status()
         data = response.json()
         if data:
@@ -58,7 +230,7 @@ def geocode_locationiq(address):
             lon = float(data[0]['lon'])
             return lat, lon
     except Exception as e:
-        print(f"LocationIQ geocoding failed for '{address}': {e}")
+        print(f"LocationIQ geocoding failed for '{_address_label(address)}': {e}")
     return None, None
 
 
@@ -66,91 +238,329 @@ def geocode_address(address):
     """
     Geocode an address using Nominatim (OpenStreetMap) with fallback to LocationIQ.
 
-    Retries up to MAX_RETRIES times on failure with delay between retries.
+    Results are served from the persistent geocode cache when available and
+    stored there after a successful lookup.
+
+    Args:
+        address (str or tuple): Address string, or (city, state) pair for a structured query.
+
+    Returns:
+        tuple or (None, None): Latitude and longitude if found,
+                               otherwise (None, None).
+    """
+    cached = _cache_get(address)
+    if cached is not None:
+        return cached
+    lat, lon = _geocode_address_uncached(address)
+    _cache_set(address, lat, lon)
+    return lat, lon
+
+
+def _geocode_address_uncached(address):
+    """
+    Query Nominatim for an address, falling back to LocationIQ.
+
+    Transient failures are retried by the shared client (up to MAX_RETRIES
+    times with exponential back-off) before falling back to LocationIQ.
 
     Args:
-        address (str): Address string to geocode.
+        address (str or tuple): Address string, or (city, state) pair for a structured query.
 
     Returns:
         tuple or (None, None): Latitude and longitude if found,
                                otherwise (None, None).
     """
     params = {
-        "q": address,
+        **_query_params(address),
         "format": "json",
         "limit": 1,
         "countrycodes": "us"
     }
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            response = requests.get(
-                GEOCODE_URL, params=params,
-                headers={"User-Agent": USER_AGENT},
-                timeout=10
-            )
+    try:
+        response = _get_with_retry(GEOCODE_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        print(f"Nominatim geocoding failed for '{_address_label(address)}': {e}, trying LocationIQ fallback.")
+        return geocode_locationiq(address)
+
+    if data:
+        lat = float(data[0]["lat"])
+        lon = float(data[0]["lon"])
+        return lat, lon
+    print(f"Nominatim: No results for '{_address_label(address)}', falling back.")
+    return geocode_locationiq(address)
+
+
+async def _fetch_json(client, url, params, limiter):
+    """
+    GET a JSON document under a rate limiter, retrying transient failures.
+
+    Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        url (str): Endpoint URL.
+        params (dict): Query parameters.
+        limiter (AsyncLimiter): Rate limiter for the target host.
+
+    Returns:
+        Parsed JSON response.
+
+    Raises:
+        httpx.HTTPError: If the request still fails after MAX_RETRIES retries.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        async with limiter:
+            response = await client.get(url, params=params)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
             response.raise_for_status()
-            data = response.json()
-            if data:
-                lat = float(data[0]["lat"])
-                lon = float(data[0]["lon"])
-                return lat, lon
-            else:
-                print(f"Nominatim: No results for '{address}', falling back.")
-                return geocode_locationiq(address)
-        except Exception as e:
-            print(f"Attempt {attempt} - Nominatim geocoding failed for '{address}': {e}")
-            if attempt < MAX_RETRIES:
-                time.sleep(RETRY_DELAY)
-            else:
-                print(f"Max retries reached for '{address}', trying LocationIQ fallback.")
-                return geocode_locationiq(address)
+            return response.json()
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+async def geocode_locationiq_async(client, address, limiter):
+    """
+    Asynchronous counterpart of geocode_locationiq().
+
+    Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        address (str or tuple): Address string, or (city, state) pair for a structured query.
+        limiter (AsyncLimiter): LocationIQ rate limiter.
+
+    Returns:
+        tuple or (None, None): Latitude and longitude if found,
+                               otherwise (None, None).
+    """
+    params = {
+        "key": LOCATIONIQ_API_KEY,
+        **_query_params(address),
+        "format": "json",
+        "limit": 1
+    }
+    try:
+        data = await _fetch_json(client, LOCATIONIQ_URL, params, limiter)
+        if data:
+            return float(data[0]["lat"]), float(data[0]["lon"])
+    except Exception as e:
+        print(f"LocationIQ geocoding failed for '{_address_label(address)}': {e}")
     return None, None
 
 
-def load_fuel_prices():
+async def geocode_address_async(client, address, nominatim_limiter, locationiq_limiter):
     """
-    Load fuel price data from a CSV file, ensuring latitude and longitude are present.
+    Asynchronous counterpart of geocode_address().
 
-    If lat/lon are missing, attempts to geocode based on city/state fields.
+    Args:
+        client (httpx.AsyncClient): Shared HTTP/2 client.
+        address (str or tuple): Address string, or (city, state) pair for a structured query.
+        nominatim_limiter (AsyncLimiter): Nominatim rate limiter.
+        locationiq_limiter (AsyncLimiter): LocationIQ rate limiter.
 
     Returns:
-        pandas.DataFrame: DataFrame with columns including latitude, longitude, and price.
+        tuple or (None, None): Latitude and longitude if found,
+                               otherwise (None, None).
     """
-    csv_path = os.path.join(settings.BASE_DIR, "core", "fuel-price-geocoded.csv")
-    df = pd.read_csv(csv_path)
+    params = {
+        **_query_params(address),
+        "format": "json",
+        "limit": 1,
+        "countrycodes": "us"
+    }
+    try:
+        data = await _fetch_json(client, GEOCODE_URL, params, nominatim_limiter)
+    except Exception as e:
+        print(f"Nominatim geocoding failed for '{_address_label(address)}': {e}, trying LocationIQ fallback.")
+        return await geocode_locationiq_async(client, address, locationiq_limiter)
+
+    if data:
+        return float(data[0]["lat"]), float(data[0]["lon"])
+    print(f"Nominatim: No results for '{_address_label(address)}', falling back.")
+    return await geocode_locationiq_async(client, address, locationiq_limiter)
+
+
+async def _geocode_addresses(addresses, batch_size):
+    """
+    Run geocode_address_async() over `addresses` on one HTTP/2 client.
 
-    # Normalize column names to lowercase with underscores
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    The async client is bound to the running event loop, so one is opened
+    per batch run rather than shared at module level like CLIENT.
+    """
+    nominatim_limiter = AsyncLimiter(NOMINATIM_RATE, 1)
+    locationiq_limiter = AsyncLimiter(LOCATIONIQ_RATE, 1)
+
+    results = []
+    async with httpx.AsyncClient(
+        http2=True,
+        timeout=REQUEST_TIMEOUT,
+        limits=HTTP_LIMITS,
+        headers={"User-Agent": USER_AGENT},
+    ) as client:
+        # Gather in chunks so only batch_size coroutines are alive at once
+        for start in range(0, len(addresses), batch_size):
+            chunk = addresses[start:start + batch_size]
+            results.extend(await asyncio.gather(*[
+                geocode_address_async(client, address, nominatim_limiter, locationiq_limiter)
+                for address in chunk
+            ]))
+    return results
+
+
+def geocode_addresses(addresses, batch_size=GEOCODE_BATCH_SIZE):
+    """
+    Geocode many addresses concurrently, honouring per-provider rate limits.
+
+    Addresses already in the persistent geocode cache are not re-queried,
+    and each distinct uncached address is looked up only once.
 
-    # Rename 'retail_price' to 'price' if present
-    if 'retail_price' in df.columns:
-        df.rename(columns={'retail_price': 'price'}, inplace=True)
+    Args:
+        addresses (list): Address strings or (city, state) pairs to geocode.
+        batch_size (int): Maximum number of in-flight geocoding tasks.
+
+    Returns:
+        list: (latitude, longitude) tuples in the same order as `addresses`,
+              with (None, None) for addresses that could not be geocoded.
+    """
+    resolved = {}
+    misses = {}
+    for address in addresses:
+        key = _cache_key(address)
+        if key in resolved or key in misses:
+            continue
+        cached = _cache_get(address)
+        if cached is not None:
+            resolved[key] = cached
+        else:
+            misses[key] = address
+
+    if misses:
+        coords = asyncio.run(_geocode_addresses(list(misses.values()), batch_size))
+        for (key, address), (lat, lon) in zip(misses.items(), coords):
+            _cache_set(address, lat, lon)
+            resolved[key] = (lat, lon)
+
+    return [resolved[_cache_key(address)] for address in addresses]
+
+
+def _normalize_column(name):
+    """Normalize a CSV column name to lowercase with underscores ('Retail Price' -> 'price')."""
+    name = name.strip().lower().replace(" ", "_")
+    return 'price' if name == 'retail_price' else name
+
+
+def _geocode_fuel_prices_csv(csv_path):
+    """
+    Add Latitude and Longitude columns to a fuel prices CSV by geocoding city/state.
+
+    Rows are streamed through the geocoder GEOCODE_STREAM_ROWS at a time and
+    written out as they are resolved, so memory use does not grow with the
+    file size. The geocoded file is written to a uniquely named temporary
+    file, which atomically replaces the original or is removed on failure.
+
+    Args:
+        csv_path (str): Path to the fuel prices CSV.
+    """
+    outfile = tempfile.NamedTemporaryFile(
+        'w', dir=os.path.dirname(csv_path), suffix='.tmp', delete=False,
+        newline='', encoding='utf-8',
+    )
+    try:
+        with open(csv_path, newline='', encoding='utf-8') as infile, outfile:
+            reader = csv.reader(infile)
+            header = next(reader)
+            columns = [_normalize_column(c) for c in header]
+            city_idx = columns.index('city')
+            state_idx = columns.index('state')
+
+            writer = csv.writer(outfile)
+            writer.writerow(header + ['Latitude', 'Longitude'])
+
+            # Skip blank lines and pad short rows, as pd.read_csv would
+            rows = enumerate(row + [''] * (len(header) - len(row)) for row in reader if row)
+            while True:
+                batch = list(itertools.islice(rows, GEOCODE_STREAM_ROWS))
+                if not batch:
+                    break
+
+                # Geocode as structured (city, state) queries
+                addresses = [
+                    (row[city_idx], row[state_idx])
+                    for _, row in batch
+                    if row[city_idx] and row[state_idx]
+                ]
+                coords = iter(geocode_addresses(addresses))
+
+                for idx, row in batch:
+                    if row[city_idx] and row[state_idx]:
+                        lat, lon = next(coords)
+                    else:
+                        print(f"Row {idx} missing city/state. Skipping.")
+                        lat, lon = None, None
+                    writer.writerow(row + [lat, lon])
+
+        os.replace(outfile.name, csv_path)
+    except BaseException:
+        os.unlink(outfile.name)
+        raise
+
+
+def fuel_prices_geocoded():
+    """
+    Check whether the fuel prices CSV already has latitude/longitude columns.
+
+    Returns:
+        bool: True if the CSV can be loaded without geocoding it first.
+    """
+    header = pd.read_csv(_fuel_prices_path(), nrows=0).columns
+    columns = {_normalize_column(c) for c in header}
+    return 'latitude' in columns and 'longitude' in columns
+
+
+def iter_fuel_prices(chunksize=FUEL_PRICES_CHUNK_ROWS):
+    """
+    Load fuel price data from a CSV file in chunks, ensuring latitude and longitude are present.
+
+    If lat/lon are missing, the CSV is first geocoded in place from its
+    city/state fields.
+
+    Args:
+        chunksize (int): Number of CSV rows parsed per chunk.
+
+    Yields:
+        pandas.DataFrame: Chunks with columns including latitude, longitude, and price.
+    """
+    csv_path = _fuel_prices_path()
 
     # Check if latitude and longitude columns exist, else geocode addresses
-    if 'latitude' not in df.columns or 'longitude' not in df.columns:
+    if not fuel_prices_geocoded():
         print("Latitude/Longitude missing in CSV. Attempting to geocode...")
-        latitudes = []
-        longitudes = []
-
-        for idx, row in df.iterrows():
-            city, state = row.get('city'), row.get('state')
-            if pd.notna(city) and pd.notna(state):
-                full_address = f"{city}, {state}"
-                lat, lon = geocode_address(full_address)
-            else:
-                print(f"Row {idx} missing city/state. Skipping.")
-                lat, lon = None, None
+        _geocode_fuel_prices_csv(csv_path)
+    header = pd.read_csv(csv_path, nrows=0).columns
 
-            latitudes.append(lat)
-            longitudes.append(lon)
-            time.sleep(1)  # avoid overloading geocoding API
+    dtypes = {
+        c: FUEL_PRICES_DTYPES[_normalize_column(c)]
+        for c in header
+        if _normalize_column(c) in FUEL_PRICES_DTYPES
+    }
+    reader = pd.read_csv(
+        csv_path,
+        usecols=list(dtypes),
+        dtype=dtypes,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk.columns = [_normalize_column(c) for c in chunk.columns]
 
-        df['latitude'] = latitudes
-        df['longitude'] = longitudes
+        # Remove rows with missing essential data
+        yield chunk.dropna(subset=['latitude', 'longitude', 'price'])
 
-    # Remove rows with missing essential data
-    df.dropna(subset=['latitude', 'longitude', 'price'], inplace=True)
-    return df
+
+def load_fuel_prices():
+    """
+    Load fuel price data from a CSV file, ensuring latitude and longitude are present.
+
+    Returns:
+        pandas.DataFrame: DataFrame with columns including latitude, longitude, and price.
+    """
+    return pd.concat(iter_fuel_prices())
 
 
 def get_route(start, end, api_key):
@@ -176,7 +586,7 @@ def get_route(start, end, api_key):
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = _get_with_retry(url, params=params, headers=headers)
         response.raise_for_status()
         data = response.json()
     except Exception as e:
@@ -190,33 +600,232 @@ def get_route(start, end, api_key):
     return route_coords, distance_miles
 
 
-def find_nearby_stations(point, stations_df, radius=10):
+def _fuel_prices_path():
+    """Return the path of the geocoded fuel prices CSV."""
+    return os.path.join(settings.BASE_DIR, "core", FUEL_PRICES_CSV)
+
+
+def _concat(parts, dtype):
+    """Concatenate per-chunk arrays, returning an empty array when there are none."""
+    return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+
+def _build_stations(chunks):
+    """
+    Extract station columns into parallel arrays.
+
+    Columns are accumulated chunk by chunk, so only one chunk is held as a
+    DataFrame at a time. Stations are then sorted by ascending price, so
+    station index order is price order.
+
+    Args:
+        chunks (iterable): DataFrames as yielded by iter_fuel_prices().
+
+    Returns:
+        Stations: Prepared station data.
+    """
+    latitudes, longitudes, prices, names = [], [], [], []
+    for chunk in chunks:
+        latitudes.append(chunk['latitude'].to_numpy(dtype=float))
+        longitudes.append(chunk['longitude'].to_numpy(dtype=float))
+        prices.append(chunk['price'].to_numpy(dtype=float))
+        if 'truckstop_name' in chunk.columns:
+            names.append(chunk['truckstop_name'].to_numpy(dtype=object, na_value='Unknown'))
+        else:
+            names.append(np.full(len(chunk), 'Unknown', dtype=object))
+
+    prices = _concat(prices, float)
+    order = np.argsort(prices, kind='stable')
+    latitudes = _concat(latitudes, float)[order]
+    longitudes = _concat(longitudes, float)[order]
+    lat_rad = np.radians(latitudes)
+    lon_rad = np.radians(longitudes)
+    return Stations(
+        latitudes=latitudes,
+        longitudes=longitudes,
+        lat_rad=lat_rad.astype(np.float32),
+        lon_rad=lon_rad.astype(np.float32),
+        cos_lat=np.cos(lat_rad).astype(np.float32),
+        prices=prices[order],
+        names=_concat(names, object)[order],
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_stations(signature):
+    """Load and index the fuel prices CSV; `signature` only keys the cache."""
+    return _build_stations(iter_fuel_prices())
+
+
+def stations_signature():
+    """
+    Identify the current version of the fuel prices CSV.
+
+    Returns:
+        tuple: (modification time in ns, size in bytes) of the CSV.
+    """
+    stat = os.stat(_fuel_prices_path())
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_stations():
+    """
+    Return prepared station data, loading it at most once per CSV version.
+
+    The cache is keyed on stations_signature(), so the data is reloaded
+    automatically when the file changes on disk. Loads are serialized, so
+    concurrent first requests do not each parse (or geocode) the CSV.
+
+    Returns:
+        Stations: Prepared station data.
+    """
+    with _stations_lock:
+        return _load_stations(stations_signature())
+
+
+def _find_nearby(point, stations, radius):
+    """
+    Find stations within `radius` miles of `point`, cheapest first.
+
+    Args:
+        point (tuple): (latitude, longitude) of the reference point.
+        stations (Stations): Prepared station data.
+        radius (float): Search radius in miles.
+
+    Returns:
+        list: See find_nearby_stations().
+    """
+    plat, plon = np.radians(point)
+    a = (np.sin((stations.lat_rad - plat) / 2) ** 2
+         + np.cos(plat) * stations.cos_lat * np.sin((stations.lon_rad - plon) / 2) ** 2)
+
+    # Stations are stored cheapest first, so index order is price order
+    idx = np.flatnonzero(a <= _radius_haversine(radius))
+    return [_station_entry(stations, i) for i in idx]
+
+
+def _station_entry(stations, i):
+    """
+    Format station `i` as (station_point (lat, lon), price_per_gallon, station_name).
+    """
+    return (
+        (float(stations.latitudes[i]), float(stations.longitudes[i])),
+        float(stations.prices[i]),
+        stations.names[i],
+    )
+
+
+def _radius_haversine(radius):
+    """
+    Convert a radius in miles to the haversine term a = sin^2(d / 2R).
+
+    `a` is a quarter of the squared chord between two points on the unit
+    sphere and grows monotonically with distance, so comparing it against
+    this threshold is equivalent to comparing great-circle distances while
+    skipping the sqrt/arcsin of the full haversine formula.
+    """
+    half_angle = min(radius / (2 * EARTH_RADIUS_MILES), np.pi / 2)
+    return np.sin(half_angle) ** 2
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _cheapest_within(point_lat, point_lon, station_lat, station_lon, station_cos_lat, radius_hav):
+    """
+    Find the cheapest station within range of each point.
+
+    Stations must be sorted by ascending price, so the first station found
+    in range is the cheapest and the scan stops there. Points are processed
+    in parallel.
+
+    Args:
+        point_lat (numpy.ndarray): Point latitudes in radians.
+        point_lon (numpy.ndarray): Point longitudes in radians.
+        station_lat (numpy.ndarray): Station latitudes in radians, cheapest first.
+        station_lon (numpy.ndarray): Station longitudes in radians, cheapest first.
+        station_cos_lat (numpy.ndarray): Precomputed cosine of the station latitudes.
+        radius_hav (float): Search radius as from _radius_haversine().
+
+    Returns:
+        numpy.ndarray: Station index per point, or -1 if none is in range.
+    """
+    best = np.full(point_lat.shape[0], -1, dtype=np.int64)
+    for p in prange(point_lat.shape[0]):
+        plat = point_lat[p]
+        plon = point_lon[p]
+        cos_plat = np.cos(plat)
+        for s in range(station_lat.shape[0]):
+            dlat = station_lat[s] - plat
+            dlon = station_lon[s] - plon
+            # Compare the haversine term directly; no sqrt/arcsin in the hot loop
+            a = np.sin(dlat / 2) ** 2 + cos_plat * station_cos_lat[s] * np.sin(dlon / 2) ** 2
+            if a <= radius_hav:
+                best[p] = s
+                break
+    return best
+
+
+def find_nearby_stations(point, radius=10):
     """
     Find fuel stations within a given radius (in miles) of a geographic point.
 
+    Uses the station data cached by _get_stations(), so nothing is rebuilt
+    per call.
+
     Args:
         point (tuple): (latitude, longitude) of the reference point.
-        stations_df (pandas.DataFrame): DataFrame with fuel stations including lat/lon and price.
         radius (float): Search radius in miles.
 
     Returns:
         list: Sorted list of tuples containing
               (station_point (lat, lon), price_per_gallon, station_name).
     """
-    def compute_distance(row):
-        return geodesic(point, (row.latitude, row.longitude)).miles
+    return _find_nearby(point, _get_stations(), radius)
 
-    stations_df = stations_df.copy()
-    stations_df['distance'] = stations_df.apply(compute_distance, axis=1)
-    nearby_df = stations_df[stations_df['distance'] <= radius].copy()
-    nearby_df.sort_values('price', inplace=True)
 
-    nearby = []
-    for _, row in nearby_df.iterrows():
-        station_point = (row['latitude'], row['longitude'])
-        station_name = row.get('truckstop_name', 'Unknown')
-        nearby.append((station_point, row['price'], station_name))
-    return nearby
+def _segment_distances(route_coords):
+    """
+    Compute the haversine length of every route segment in one vectorized pass.
+
+    Args:
+        route_coords (list): (latitude, longitude) tuples along the route.
+
+    Returns:
+        numpy.ndarray: Distance in miles between each pair of consecutive points.
+    """
+    coords = np.radians(np.asarray(route_coords, dtype=float).reshape(-1, 2))
+    lat, lon = coords[:, 0], coords[:, 1]
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
+    cos_lat = np.cos(lat)
+    a = np.sin(dlat / 2) ** 2 + cos_lat[:-1] * cos_lat[1:] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def _range_stop_indices(cumulative, range_miles):
+    """
+    Find where the distance driven since the previous stop first reaches the range.
+
+    Args:
+        cumulative (numpy.ndarray): Cumulative route distance at each point after the start.
+        range_miles (float): Maximum miles per tank.
+
+    Returns:
+        list: Route point indices of the range-triggered stops, excluding the final point.
+
+    Raises:
+        ValueError: If range_miles is not positive.
+    """
+    if not range_miles > 0:
+        raise ValueError(f"range_miles must be positive, got {range_miles}")
+
+    stops = []
+    last_stop_distance = 0.0
+    while True:
+        k = int(np.searchsorted(cumulative, last_stop_distance + range_miles))
+        if k >= len(cumulative) - 1:
+            return stops
+        stops.append(k + 1)
+        last_stop_distance = cumulative[k]
 
 
 def plan_fuel_stops(start, end, api_key, mpg=10, range_miles=500, radius=10):
@@ -235,37 +844,46 @@ def plan_fuel_stops(start, end, api_key, mpg=10, range_miles=500, radius=10):
         dict: Dictionary containing total distance, total gallons needed,
               estimated fuel cost, list of fuel stops, and route coordinates.
     """
-    stations_df = load_fuel_prices()
+    stations = _get_stations()
     route_coords, total_distance = get_route(start, end, api_key)
     fuel_needed = total_distance / mpg
 
     stops = []
-    accumulated_distance = 0
-
-    for i in range(1, len(route_coords)):
-        segment_dist = geodesic(route_coords[i-1], route_coords[i]).miles
-        accumulated_distance += segment_dist
-
-        # Decide if a fuel stop is needed (range exceeded or last point)
-        if accumulated_distance >= range_miles or i == len(route_coords) - 1:
+    segments = _segment_distances(route_coords)
+
+    if len(segments):
+        last_index = len(route_coords) - 1
+        stop_indices = _range_stop_indices(np.cumsum(segments), range_miles) + [last_index]
+
+        # Pick the cheapest station for every stop in one compiled pass
+        stop_points = np.radians(np.asarray([route_coords[i] for i in stop_indices], dtype=np.float32))
+        best = _cheapest_within(
+            np.ascontiguousarray(stop_points[:, 0]),
+            np.ascontiguousarray(stop_points[:, 1]),
+            stations.lat_rad,
+            stations.lon_rad,
+            stations.cos_lat,
+            _radius_haversine(radius),
+        )
+
+        for i, station_idx in zip(stop_indices, best):
+            if station_idx < 0:
+                continue
             point = route_coords[i]
-            nearby_stations = find_nearby_stations(point, stations_df, radius)
-            if nearby_stations:
-                best_station = nearby_stations[0]
-                # Calculate gallons for final leg differently
-                if i == len(route_coords) - 1:
-                    gallons_needed = segment_dist / mpg
-                else:
-                    gallons_needed = range_miles / mpg
-                cost = gallons_needed * best_station[1]
-                stops.append({
-                    "location": point,
-                    "station_name": best_station[2],
-                    "price_per_gallon": best_station[1],
-                    "gallons": round(gallons_needed, 2),
-                    "cost": round(cost, 2),
-                })
-            accumulated_distance = 0  # reset after stop
+            _, price, station_name = _station_entry(stations, station_idx)
+            # Calculate gallons for final leg differently
+            if i == last_index:
+                gallons_needed = segments[-1] / mpg
+            else:
+                gallons_needed = range_miles / mpg
+            cost = gallons_needed * price
+            stops.append({
+                "location": point,
+                "station_name": station_name,
+                "price_per_gallon": price,
+                "gallons": round(gallons_needed, 2),
+                "cost": round(cost, 2),
+            })
 
     total_cost = sum(stop["cost"] for stop in stops)
     return {
@@ -1,14 +1,20 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import plan_fuel_stops
+from .utils import plan_fuel_stops, stations_signature
+import hashlib
+import json
 import logging
 
 api_key = settings.OPENROUTESERVICE_API_KEY
 logger = logging.getLogger(__name__)
 
+RESPONSE_CACHE_TIMEOUT = 3600  # seconds
+COORD_PRECISION = 5  # decimal places (~1 m), so near-identical requests share a cache entry
+
 
 def is_valid_coord(coord):
     """
@@ -29,6 +35,36 @@ def is_valid_coord(coord):
         return False
 
 
+def response_cache_key(start, end, mpg, range_miles, radius, signature):
+    """
+    Build a stable cache key for a fuel optimization request.
+
+    The station data signature is part of the key, so cached responses are
+    not served once the fuel prices CSV has been reloaded.
+
+    Args:
+        start (tuple): (latitude, longitude) of the start point.
+        end (tuple): (latitude, longitude) of the end point.
+        mpg (float): Vehicle miles per gallon.
+        range_miles (float): Vehicle max range per tank in miles.
+        radius (float): Search radius for fuel stops in miles.
+        signature (tuple): Station data version, as from stations_signature().
+
+    Returns:
+        str: Cache key derived from the rounded request parameters.
+    """
+    params = [
+        [round(c, COORD_PRECISION) for c in start],
+        [round(c, COORD_PRECISION) for c in end],
+        mpg,
+        range_miles,
+        radius,
+        list(signature),
+    ]
+    digest = hashlib.sha1(json.dumps(params).encode()).hexdigest()
+    return f"fuel-optimizer:{digest}"
+
+
 class FuelOptimizerAPIView(APIView):
     """
     API View to calculate optimal fuel stops along a route.
@@ -43,6 +79,10 @@ class FuelOptimizerAPIView(APIView):
     Returns:
         JSON response with optimized fuel stops and route details,
         or error messages with appropriate HTTP status codes.
+
+    Successful results are cached for RESPONSE_CACHE_TIMEOUT seconds, keyed on
+    the request parameters with coordinates rounded to COORD_PRECISION places
+    and on the version of the station data.
     """
 
     def post(self, request):
@@ -77,6 +117,18 @@ class FuelOptimizerAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            # Validate vehicle parameters; a non-positive range never advances along the route
+            if not mpg > 0 or not range_miles > 0:
+                return Response(
+                    {"error": "'mpg' and 'range' must be positive numbers."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if not radius >= 0:
+                return Response(
+                    {"error": "'radius' must be a non-negative number."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             # Validate API key presence
             if not settings.OPENROUTESERVICE_API_KEY:
                 return Response(
@@ -87,6 +139,13 @@ class FuelOptimizerAPIView(APIView):
             start_coords = (float(start["lat"]), float(start["lon"]))
             end_coords = (float(end["lat"]), float(end["lon"]))
 
+            cache_key = response_cache_key(
+                start_coords, end_coords, mpg, range_miles, radius, stations_signature()
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return Response(cached, status=status.HTTP_200_OK)
+
             # Call the utility function that plans fuel stops
             result = plan_fuel_stops(
                 start=start_coords,
@@ -96,6 +155,7 @@ class FuelOptimizerAPIView(APIView):
                 range_miles=range_miles,
                 radius=radius,
             )
+            cache.set(cache_key, result, timeout=RESPONSE_CACHE_TIMEOUT)
 
             return Response(result, status=status.HTTP_200_OK)
 